@@ -0,0 +1,48 @@
+"""
+factory 测试公共配置
+
+将处理器与流水线目录加入 Python 路径（只执行一次），
+测试模块直接导入 QuestionnaireCleaner / QuestionnairePipeline；
+数据记录路径与预期清洗结果在整个测试会话内共享
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# 目录常量（收集测试时计算一次）
+FACTORY_DIR = Path(__file__).parent
+PROCESSOR_DIR = FACTORY_DIR / "processor"
+PIPELINE_DIR = FACTORY_DIR / "pipeline"
+RECORD_DIR = FACTORY_DIR.parent / "catelog" / "record"
+
+for module_dir in (PROCESSOR_DIR, PIPELINE_DIR):
+    if str(module_dir) not in sys.path:
+        sys.path.insert(0, str(module_dir))
+
+
+@pytest.fixture(scope="session")
+def record_dir():
+    """返回记录目录路径"""
+    return RECORD_DIR
+
+
+@pytest.fixture(scope="session")
+def dirty_csv_path(record_dir):
+    """返回脏数据 CSV 文件路径"""
+    return record_dir / "dirty.csv"
+
+
+@pytest.fixture(scope="session")
+def clean_csv_path(record_dir):
+    """返回清洗后数据 CSV 文件路径"""
+    return record_dir / "clean.csv"
+
+
+@pytest.fixture(scope="session")
+def expected_clean_df(clean_csv_path):
+    """加载预期清洗后数据（会话内只读取一次，测试中只读）"""
+    return pd.read_csv(clean_csv_path)
+
@@ -6,17 +6,36 @@
 结果与 catalog/record 中的 clean.csv 进行对比验证
 """
 
+import os
 import sys
+import multiprocessing as mp
+from functools import partial
 from pathlib import Path
+from typing import Optional
+import numpy as np
 import pandas as pd
 
-# 添加处理器目录到路径
-processor_dir = Path(__file__).parent.parent / "processor"
-sys.path.insert(0, str(processor_dir))
+# 目录常量（模块导入时计算一次）
+FACTORY_DIR = Path(__file__).parent.parent
+PROCESSOR_DIR = FACTORY_DIR / "processor"
+RECORD_DIR = FACTORY_DIR.parent / "catelog" / "record"
+
+# 添加处理器目录到路径（已由调用方配置时不重复添加）
+if str(PROCESSOR_DIR) not in sys.path:
+    sys.path.insert(0, str(PROCESSOR_DIR))
 
 from questionnaire_cleaner import QuestionnaireCleaner
 
 
+def _clean_chunk(cleaner_cls: type, chunk: pd.DataFrame) -> pd.DataFrame:
+    """
+    在子进程中对一个分块执行阶段1-5
+
+    每个分块使用新建的清洗器，不把父进程清洗器上保存的 raw_df / cleaned_df 传给子进程
+    """
+    return cleaner_cls()._clean_columns(chunk)
+
+
 class QuestionnairePipeline:
     """
     问卷数据清洗流水线
@@ -25,23 +44,36 @@ class QuestionnairePipeline:
     1. 加载 dirty.csv 原始数据
     2. 使用 QuestionnaireCleaner 进行清洗
     3. 返回清洗后的数据（暂不保存）
+
+    num_workers > 1 时按行分块，在进程池中并行清洗后合并
     """
 
-    def __init__(self, dirty_csv_path: Path):
+    # 低基数分类列直接读为 category（同时覆盖中文原始列名与英文列名，不存在的列会被忽略）
+    CATEGORY_COLUMNS = [
+        "所属部门", "性别", "教育程度", "雇佣状态", "城市",
+        "dept", "gender", "edu", "emp_status", "city"
+    ]
+
+    def __init__(self, dirty_csv_path: Path, num_workers: Optional[int] = 1):
         """
         初始化流水线
 
         Args:
             dirty_csv_path: 脏数据 CSV 文件路径
+            num_workers: 并行清洗的进程数，None 表示使用全部 CPU 核心，1 表示不并行
         """
         self.dirty_csv_path = Path(dirty_csv_path)
+        self.num_workers = num_workers or os.cpu_count()
         self.cleaner = QuestionnaireCleaner()
         self.raw_df = None
         self.cleaned_df = None
 
     def load_data(self) -> pd.DataFrame:
-        """加载原始数据"""
-        self.raw_df = pd.read_csv(self.dirty_csv_path)
+        """加载原始数据，分类列读为 category"""
+        self.raw_df = pd.read_csv(
+            self.dirty_csv_path,
+            dtype={col: "category" for col in self.CATEGORY_COLUMNS}
+        )
         return self.raw_df
 
     def process(self) -> pd.DataFrame:
@@ -54,7 +86,21 @@ class QuestionnairePipeline:
         if self.raw_df is None:
             self.load_data()
 
-        self.cleaned_df = self.cleaner.process(self.raw_df)
+        num_workers = min(self.num_workers, len(self.raw_df))
+        if num_workers <= 1:
+            self.cleaned_df = self.cleaner.process(self.raw_df)
+            return self.cleaned_df
+
+        # 分块前先按全局行号生成 ID，避免各分块各自从 1 编号
+        raw_df = self.raw_df
+        if "id" not in raw_df.columns:
+            raw_df = raw_df.assign(id=np.arange(1, len(raw_df) + 1))
+        chunks = [raw_df.iloc[rows] for rows in np.array_split(np.arange(len(raw_df)), num_workers)]
+
+        with mp.Pool(num_workers) as pool:
+            parts = pool.map(partial(_clean_chunk, type(self.cleaner)), chunks)
+
+        self.cleaned_df = self.cleaner.combine(parts, raw_df=self.raw_df)
         return self.cleaned_df
 
     def run(self) -> pd.DataFrame:
@@ -70,10 +116,7 @@ class QuestionnairePipeline:
 def main():
     """主函数：运行流水线并输出结果"""
     # 获取路径
-    pipeline_dir = Path(__file__).parent
-    record_dir = pipeline_dir.parent.parent / "catelog" / "record"
-    dirty_csv_path = record_dir / "dirty.csv"
-    clean_csv_path = record_dir / "clean.csv"
+    dirty_csv_path = RECORD_DIR / "dirty.csv"
 
     print(f"加载原始数据: {dirty_csv_path}")
     pipeline = QuestionnairePipeline(dirty_csv_path)
@@ -5,61 +5,34 @@
 """
 
 import pytest
+import numpy as np
 import pandas as pd
-import sys
-from pathlib import Path
-
-# 添加处理器目录到路径
-pipeline_dir = Path(__file__).parent
-processor_dir = pipeline_dir.parent / "processor"
-sys.path.insert(0, str(processor_dir))
+from pandas.testing import assert_frame_equal
 
+# 模块路径由 factory/conftest.py 统一配置
 from questionnaire_pipeline import QuestionnairePipeline
 
 
 class TestQuestionnairePipeline:
     """问卷流水线集成测试类"""
 
-    @pytest.fixture
-    def pipeline_dir(self):
-        """返回流水线目录路径"""
-        return Path(__file__).parent
-
-    @pytest.fixture
-    def record_dir(self, pipeline_dir):
-        """返回记录目录路径"""
-        return pipeline_dir.parent.parent / "catelog" / "record"
-
-    @pytest.fixture
-    def dirty_csv_path(self, record_dir):
-        """返回脏数据 CSV 文件路径"""
-        return record_dir / "dirty.csv"
-
-    @pytest.fixture
-    def clean_csv_path(self, record_dir):
-        """返回清洗后数据 CSV 文件路径"""
-        return record_dir / "clean.csv"
+    # record_dir / dirty_csv_path / clean_csv_path / expected_clean_df 由 factory/conftest.py 提供
 
-    @pytest.fixture
-    def expected_clean_df(self, clean_csv_path):
-        """加载预期清洗后数据"""
-        return pd.read_csv(clean_csv_path)
-
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def pipeline(self, dirty_csv_path):
         """创建流水线实例"""
         return QuestionnairePipeline(dirty_csv_path)
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def actual_clean_df(self, pipeline):
-        """运行流水线获取实际清洗后数据"""
+        """运行流水线获取实际清洗后数据（模块内只运行一次，测试中只读）"""
         return pipeline.run()
 
     # ========== 基础功能测试 ==========
 
-    def test_pipeline_loads_data(self, pipeline, dirty_csv_path):
-        """测试流水线能正确加载数据"""
-        raw_df = pipeline.load_data()
+    def test_pipeline_loads_data(self, pipeline, actual_clean_df):
+        """测试流水线能正确加载数据（复用 run() 已加载的 raw_df，不重复读取 CSV）"""
+        raw_df = pipeline.raw_df
 
         assert raw_df is not None
         assert isinstance(raw_df, pd.DataFrame)
@@ -67,13 +40,11 @@ class TestQuestionnairePipeline:
         # dirty.csv 应该有19条记录
         assert len(raw_df) == 19
 
-    def test_pipeline_processes_data(self, pipeline):
+    def test_pipeline_processes_data(self, actual_clean_df):
         """测试流水线能正确处理数据"""
-        cleaned_df = pipeline.run()
-
-        assert cleaned_df is not None
-        assert isinstance(cleaned_df, pd.DataFrame)
-        assert len(cleaned_df) == 19
+        assert actual_clean_df is not None
+        assert isinstance(actual_clean_df, pd.DataFrame)
+        assert len(actual_clean_df) == 19
 
     # ========== 基本结构测试 ==========
 
@@ -107,9 +78,9 @@ class TestQuestionnairePipeline:
             "benefit_other", "is_duplicate"
         ]
 
-        for col in boolean_columns:
-            if col in actual_clean_df.columns:
-                assert pd.api.types.is_bool_dtype(actual_clean_df[col]), f"{col} 应该是布尔类型"
+        # 一次比较全部存在的布尔列的 dtype
+        dtypes = actual_clean_df.dtypes[actual_clean_df.columns.intersection(boolean_columns)]
+        assert (dtypes == np.bool_).all(), f"以下列应该是布尔类型:\n{dtypes[dtypes != np.bool_]}"
 
     # ========== 数据质量标记测试 ==========
 
@@ -151,23 +122,29 @@ class TestQuestionnairePipeline:
 
     def test_ids_are_sequential(self, actual_clean_df):
         """测试 ID 是连续的"""
-        ids = actual_clean_df["id"].tolist()
-        expected_ids = list(range(1, 20))  # 1-19
-        assert ids == expected_ids, f"ID应该是 1-19，实际: {ids}"
+        ids = actual_clean_df["id"].to_numpy(dtype=np.int64)
+        expected_ids = np.arange(1, 20, dtype=np.int64)  # 1-19
+        np.testing.assert_array_equal(ids, expected_ids, err_msg="ID应该是 1-19", strict=True)
 
     # ========== 流水线完整性测试 ==========
 
-    def test_pipeline_preserves_record_count(self, pipeline):
+    def test_pipeline_preserves_record_count(self, pipeline, actual_clean_df):
         """测试流水线保持记录数"""
-        raw_df = pipeline.load_data()
-        cleaned_df = pipeline.run()
+        assert len(actual_clean_df) == len(pipeline.raw_df), "清洗后记录数应该等于原始记录数"
 
-        assert len(cleaned_df) == len(raw_df), "清洗后记录数应该等于原始记录数"
+    def test_parallel_run_matches_serial_run(self, pipeline, dirty_csv_path, actual_clean_df):
+        """测试分块并行清洗结果与串行一致（跨分块的重复记录同样被标记）"""
+        parallel = QuestionnairePipeline(dirty_csv_path, num_workers=3)
+        parallel.raw_df = pipeline.raw_df  # 复用已加载的原始数据，不重复读取 CSV
+        parallel_df = parallel.run()
 
-    def test_pipeline_creates_cleaned_df_attribute(self, pipeline):
-        """测试流水线设置 cleaned_df 属性"""
-        pipeline.run()
+        assert_frame_equal(parallel_df, actual_clean_df)
+        # 与串行一致：清洗器保存完整输入；再次运行结果不变
+        assert parallel.cleaner.raw_df is parallel.raw_df
+        assert_frame_equal(parallel.run(), actual_clean_df)
 
+    def test_pipeline_creates_cleaned_df_attribute(self, pipeline, actual_clean_df):
+        """测试流水线设置 cleaned_df 属性"""
         assert pipeline.cleaned_df is not None
         assert isinstance(pipeline.cleaned_df, pd.DataFrame)
 
@@ -1,8 +1,9 @@
 # questionnaire_cleaner.py
 
+import re
 import pandas as pd
 import numpy as np
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 class QuestionnaireCleaner:
     """
@@ -13,12 +14,35 @@ class QuestionnaireCleaner:
     符合 DataContract: tests/fixtures/workspace/catelog/contract/output-contract.yaml
     """
 
+    # 配置：部门映射（未命中的部门名称保持原值）
+    DEPT_MAPPING = {
+        "研发部": "研发",
+        "R&D": "研发",
+        "销售部": "销售",
+        "生产": "生产",
+        "生产部": "生产",
+        "职能": "职能",
+        "职能部": "职能",
+        "管理": "管理",
+        "管理部": "管理",
+        "顾问": "其他",
+        "测试部门": "测试部门"
+    }
+
     # 配置：性别标准化映射
     GENDER_MAPPING = {
         "男": "male",
+        "male": "male",
+        "M": "male",
+        "1": "male",
         "女": "female",
+        "female": "female",
+        "F": "female",
+        "2": "female",
         "其他": "other",
-        "未知": "unknown"
+        "other": "other",
+        "未知": "unknown",
+        "unknown": "unknown"
     }
 
     # 配置：教育程度映射
@@ -48,7 +72,10 @@ class QuestionnaireCleaner:
     # 配置：城市标准化映射
     CITY_MAPPING = {
         "北京": "北京",
+        "Beijing": "北京",
         "上海": "上海",
+        "Shanghai": "上海",
+        "shang hai": "上海",
         "广州": "广州",
         "深圳": "深圳",
         "杭州": "杭州",
@@ -58,39 +85,79 @@ class QuestionnaireCleaner:
         "未知城市": "未知城市"
     }
 
+    # 配置：输出字段的候选来源列（按优先级排列，process 入口处一次性重命名为输出字段名）
+    _SOURCE_MAP: Dict[str, List[str]] = {
+        "submit_time": ["提交时间", "submit_time"],
+        "age": ["age", "年龄"],
+        "total_exp": ["total_exp", "工作年限"],
+        "overall_satis": ["overall_satis", "满意度"],
+        "workload": ["工作负荷", "workload"],
+        "tenure": ["tenure", "任期"],
+        "monthly_income": ["monthly_income", "月收入"],
+        "dept": ["dept", "所属部门"],
+        "gender": ["gender", "性别"],
+        "edu": ["edu", "教育程度"],
+        "emp_status": ["emp_status", "雇佣状态"],
+        "city": ["city", "城市"],
+        "benefit_pension": ["养老金", "养老"],
+        "benefit_annual_leave": ["年假", "带薪年假"],
+        "benefit_health_ins": ["医疗", "医保", "医疗保险"],
+        "benefit_other": ["其他", "其他福利"],
+        "other_notes": ["other_notes", "备注"]
+    }
+
+    # 配置：提交时间的导出格式（写 CSV 时传给 to_csv(date_format=...)；
+    # 不显式指定时 pandas 对整列均为零点的时间只写 YYYY-MM-DD）
+    SUBMIT_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+    # 配置：数值字段（目标列, 需剥离的单位, 剥离单位后整格替换的字面量）
+    # 单位均为固定字面量（可有多个，依次剥离），按纯文本替换（regex=False，走 str.replace，比正则替换快约一倍）
+    # 字面量对该字段的所有来源列生效（"二十八" 原先只在英文列 age 中替换，现对中文列 年龄 同样解析为 28）
+    _NUMERIC_FIELDS = [
+        ("age", ("岁",), {"二十八": "28"}),
+        ("total_exp", ("年",), {"刚入职": "0"}),
+        ("overall_satis", ("满意", "分"), {}),
+        ("workload", (), {}),
+        ("tenure", ("年",), {"刚入职": "0"}),
+        ("monthly_income", ("元",), {}),
+    ]
+
+    # 配置：数字后的 K 表示千（如 12K -> 12e3，由 to_numeric 解析为 12000）；锚定在末尾，须在剥离单位后应用；类级别预编译
+    _THOUSANDS_RE = re.compile(r"(?<=\d)[kK]$")
+
+    # 配置：备注中需去除的占位符与括注标记
+    _NOTES_MARK_RE = re.compile(r"其他〖|〗|—")
+
+    # 配置：福利字段
+    _BENEFIT_FIELDS = ["benefit_pension", "benefit_annual_leave", "benefit_health_ins", "benefit_other"]
+
+    # 配置：数据质量标记（按优先级从高到低排列，最后一项"正常"为都不满足时的默认值）
+    _QUALITY_FLAG_CATS = pd.CategoricalDtype([
+        "重复记录",
+        "测试数据",
+        "异常值_收入负数_工作负荷越界",
+        "收入缺失",
+        "关键字段缺失",
+        "逻辑校验_学生",
+        "逻辑校验_退休",
+        "正常",
+    ])
+
     def __init__(self):
         self.raw_df: Optional[pd.DataFrame] = None
         self.cleaned_df: Optional[pd.DataFrame] = None
+        # 映射表的 pd.Series 形式与标准化后的类别，按映射表属性名缓存（见 _mapping_lookup）
+        self._lookup_cache: Dict[str, tuple] = {}
 
     def process(self, raw_df: pd.DataFrame) -> pd.DataFrame:
-        """主入口：执行完整清洗流程"""
-        self.raw_df = raw_df.copy()
-        df = self.raw_df.copy()
-
-        # 阶段1：元数据标准化
-        df = self._standardize_datetime(df)
-        df = self._standardize_id(df)
-
-        # 阶段2：数值字段处理
-        df = self._process_age(df)
-        df = self._process_total_exp(df)
-        df = self._process_satisfaction(df)
-        df = self._process_workload(df)
-        df = self._process_tenure(df)
-        df = self._process_monthly_income(df)
-
-        # 阶段3：分类字段标准化
-        df = self._standardize_dept(df)
-        df = self._standardize_gender(df)
-        df = self._standardize_education(df)
-        df = self._standardize_emp_status(df)
-        df = self._standardize_city(df)
-
-        # 阶段4：福利字段处理
-        df = self._process_benefits(df)
+        """
+        主入口：执行完整清洗流程
 
-        # 阶段5：备注字段处理
-        df = self._process_other_notes(df)
+        self.raw_df 保存对输入的引用（不复制）；阶段1-5 只读取输入、返回清洗后的列，
+        汇总后一次构造只含输出字段的 DataFrame，不向原始宽表逐列插入，也不修改输入
+        """
+        self.raw_df = raw_df
+        df = self._clean_columns(raw_df)
 
         # 阶段6：重复检测与标记
         df = self._detect_duplicates(df)
@@ -104,266 +171,274 @@ class QuestionnaireCleaner:
         self.cleaned_df = df
         return self.cleaned_df
 
-    def _standardize_datetime(self, df: pd.DataFrame) -> pd.DataFrame:
-        """统一提交时间格式为 YYYY-MM-DD HH:MM:SS"""
-        df["submit_time"] = pd.to_datetime(
-            df["提交时间"] if "提交时间" in df.columns else df["submit_time"],
-            format="mixed",
-            errors="coerce"
-        ).dt.strftime("%Y-%m-%d %H:%M:%S")
-        return df
+    def _clean_columns(self, raw_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        执行阶段1-5，返回只含清洗后字段的 DataFrame
 
-    def _standardize_id(self, df: pd.DataFrame) -> pd.DataFrame:
-        """标准化ID字段为整数"""
-        if "id" not in df.columns:
-            df["id"] = range(1, len(df) + 1)
-        df["id"] = pd.to_numeric(df["id"], errors="coerce").astype("Int64")
-        return df
+        只读取输入与映射配置，不读写 self.raw_df / self.cleaned_df，可对分块单独调用
+        """
+        df = self._rename_sources(raw_df)
+        columns: Dict[str, Any] = {}
 
-    def _process_age(self, df: pd.DataFrame) -> pd.DataFrame:
-        """处理年龄字段，约束：16-200，允许NULL"""
-        # 尝试从现有列中提取年龄值
-        age_col = None
-        for col in ["年龄", "age"]:
-            if col in df.columns:
-                age_col = col
-                break
-
-        if age_col:
-            # 清理年龄数据（去除"岁"、中文字符等）
-            if "age" in df.columns:
-                df["age"] = df["age"].astype(str).str.replace("岁", "").replace("NULL", "").replace("未知", "").replace("二十八", "28")
-            elif "年龄" in df.columns:
-                df["age"] = df["年龄"].astype(str).str.replace("岁", "").replace("NULL", "").replace("未知", "")
-            df["age"] = pd.to_numeric(df["age"], errors="coerce")
-        # 不强制限制范围，允许极端值，通过data_quality_flag标记
-        return df
-
-    def _process_total_exp(self, df: pd.DataFrame) -> pd.DataFrame:
-        """处理工作年限字段，约束：0-50，允许NULL"""
-        # 清理工作年限数据
-        if "total_exp" in df.columns:
-            df["total_exp"] = df["total_exp"].astype(str).str.replace("年", "").replace("刚入职", "0")
-            df["total_exp"] = pd.to_numeric(df["total_exp"], errors="coerce")
-        elif "工作年限" in df.columns:
-            df["total_exp"] = df["工作年限"].astype(str).str.replace("年", "").replace("刚入职", "0")
-            df["total_exp"] = pd.to_numeric(df["total_exp"], errors="coerce")
-            df = df.drop(columns=["工作年限"])
-        return df
-
-    def _process_satisfaction(self, df: pd.DataFrame) -> pd.DataFrame:
-        """处理整体满意度字段，约束：0-6分，允许NULL"""
-        # 清理满意度数据
-        if "overall_satis" in df.columns:
-            df["overall_satis"] = df["overall_satis"].astype(str).str.replace("满意", "").replace("分", "")
-            df["overall_satis"] = pd.to_numeric(df["overall_satis"], errors="coerce")
-        elif "满意度" in df.columns:
-            df["overall_satis"] = df["满意度"].astype(str).str.replace("满意", "").replace("分", "")
-            df["overall_satis"] = pd.to_numeric(df["overall_satis"], errors="coerce")
-            df = df.drop(columns=["满意度"])
-        return df
-
-    def _process_workload(self, df: pd.DataFrame) -> pd.DataFrame:
-        """处理工作负荷字段，约束：1-10分，允许NULL"""
-        workload_col = "工作负荷" if "工作负荷" in df.columns else "workload"
-        df["workload"] = pd.to_numeric(df[workload_col], errors="coerce")
-        return df
+        # 阶段1：元数据标准化
+        columns.update(self._standardize_datetime(df))
+        columns.update(self._standardize_id(df))
 
-    def _process_tenure(self, df: pd.DataFrame) -> pd.DataFrame:
-        """处理任期/司龄字段，约束：0-50，支持小数，允许NULL"""
-        # 清理任期数据
-        if "tenure" in df.columns:
-            df["tenure"] = df["tenure"].astype(str).str.replace("年", "").replace("刚入职", "0")
-            df["tenure"] = pd.to_numeric(df["tenure"], errors="coerce")
-        elif "任期" in df.columns:
-            df["tenure"] = df["任期"].astype(str).str.replace("年", "").replace("刚入职", "0")
-            df["tenure"] = pd.to_numeric(df["tenure"], errors="coerce")
-            df = df.drop(columns=["任期"])
-        return df
+        # 阶段2：数值字段处理
+        columns.update(self._process_numerics(df))
 
-    def _process_monthly_income(self, df: pd.DataFrame) -> pd.DataFrame:
-        """处理月收入字段，约束：0-35000，负数转为NULL，允许NULL"""
-        # 清理月收入数据
-        if "monthly_income" in df.columns:
-            df["monthly_income"] = df["monthly_income"].astype(str).str.replace("元", "").replace("K", "000").replace("保密", "").replace("-", "")
-            df["monthly_income"] = pd.to_numeric(df["monthly_income"], errors="coerce")
-        elif "月收入" in df.columns:
-            df["monthly_income"] = df["月收入"].astype(str).str.replace("元", "").replace("K", "000").replace("保密", "").replace("-", "")
-            df["monthly_income"] = pd.to_numeric(df["monthly_income"], errors="coerce")
-            df = df.drop(columns=["月收入"])
-        # 负数转为NULL
-        df.loc[df["monthly_income"] < 0, "monthly_income"] = None
-        return df
+        # 阶段3：分类字段标准化
+        columns.update(self._standardize_dept(df))
+        columns.update(self._standardize_gender(df))
+        columns.update(self._standardize_education(df))
+        columns.update(self._standardize_emp_status(df))
+        columns.update(self._standardize_city(df))
 
-    def _standardize_dept(self, df: pd.DataFrame) -> pd.DataFrame:
-        """标准化部门字段"""
-        # 部门映射：标准化部门名称
-        dept_mapping = {
-            "研发部": "研发",
-            "R&D": "研发",
-            "销售部": "销售",
-            "生产": "生产",
-            "生产部": "生产",
-            "职能": "职能",
-            "职能部": "职能",
-            "管理": "管理",
-            "管理部": "管理",
-            "顾问": "其他",
-            "测试部门": "测试部门"
-        }
+        # 阶段4：福利字段处理
+        columns.update(self._process_benefits(df))
 
-        if "dept" in df.columns:
-            df["dept"] = df["dept"].map(dept_mapping).fillna(df["dept"])
-            df["dept"] = df["dept"].fillna("其他")
-        elif "所属部门" in df.columns:
-            df["dept"] = df["所属部门"].map(dept_mapping).fillna(df["所属部门"])
-            df["dept"] = df["dept"].fillna("其他")
-            df = df.drop(columns=["所属部门"])
-        return df
+        # 阶段5：备注字段处理
+        columns.update(self._process_other_notes(df))
 
-    def _standardize_gender(self, df: pd.DataFrame) -> pd.DataFrame:
-        """标准化性别字段为 male/female/unknown"""
-        # 扩展性别映射
-        gender_mapping = {
-            "男": "male",
-            "male": "male",
-            "M": "male",
-            "1": "male",
-            "女": "female",
-            "female": "female",
-            "F": "female",
-            "2": "female",
-            "其他": "other",
-            "other": "other",
-            "未知": "unknown",
-            "unknown": "unknown"
-        }
+        return pd.DataFrame(columns, index=df.index)
 
-        if "gender" in df.columns:
-            df["gender"] = df["gender"].fillna("unknown").map(gender_mapping).fillna("unknown")
-        elif "性别" in df.columns:
-            df["gender"] = df["性别"].fillna("unknown").map(gender_mapping).fillna("unknown")
-            df = df.drop(columns=["性别"])
-        return df
+    def combine(self, parts: List[pd.DataFrame], raw_df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        合并分块清洗结果
 
-    def _standardize_education(self, df: pd.DataFrame) -> pd.DataFrame:
-        """标准化教育程度字段，MBA映射为硕士"""
-        if "edu" in df.columns:
-            df["edu"] = df["edu"].fillna("未知").map(self.EDU_MAPPING).fillna("其他")
-        elif "教育程度" in df.columns:
-            df["edu"] = df["教育程度"].fillna("未知").map(self.EDU_MAPPING).fillna("其他")
-            df = df.drop(columns=["教育程度"])
-        return df
+        parts 为各分块 _clean_columns（阶段1-5）的结果；重复检测与质量标记依赖跨分块的全局信息，
+        因此只在合并后的整体上执行阶段6-8。raw_df 为分块前的完整输入，与 process 一样保存到 self.raw_df
+        """
+        self.raw_df = raw_df
+        df = pd.concat(parts)
+        # 各分块的部门类别集合不同，合并后退化为 object，重新转为 category
+        df["dept"] = df["dept"].astype("category")
 
-    def _standardize_emp_status(self, df: pd.DataFrame) -> pd.DataFrame:
-        """标准化雇佣状态字段"""
-        if "emp_status" in df.columns:
-            df["emp_status"] = df["emp_status"].fillna("未知").map(self.EMP_STATUS_MAPPING).fillna("其他")
-        elif "雇佣状态" in df.columns:
-            df["emp_status"] = df["雇佣状态"].fillna("未知").map(self.EMP_STATUS_MAPPING).fillna("其他")
-            df = df.drop(columns=["雇佣状态"])
-        return df
+        df = self._detect_duplicates(df)
+        df = self._add_data_quality_flags(df)
+        df = self._select_and_order_columns(df)
 
-    def _standardize_city(self, df: pd.DataFrame) -> pd.DataFrame:
-        """标准化城市字段为中文"""
-        # 城市名称标准化映射（处理大小写、空格等）
-        city_mapping = {
-            "北京": "北京",
-            "Beijing": "北京",
-            "上海": "上海",
-            "Shanghai": "上海",
-            "shang hai": "上海",
-            "广州": "广州",
-            "深圳": "深圳",
-            "杭州": "杭州",
-            "成都": "成都",
-            "重庆": "重庆",
-            "其他城市": "其他城市",
-            "未知城市": "未知城市"
-        }
+        self.cleaned_df = df
+        return self.cleaned_df
 
-        if "city" in df.columns:
-            # 先进行基本映射
-            df["city"] = df["city"].map(city_mapping)
-            # 再使用 CITY_MAPPING 进行标准化
-            df["city"] = df["city"].fillna("未知城市").map(self.CITY_MAPPING).fillna("未知城市")
-        elif "城市" in df.columns:
-            df["city"] = df["城市"].map(city_mapping)
-            df["city"] = df["city"].fillna("未知城市").map(self.CITY_MAPPING).fillna("未知城市")
-            df = df.drop(columns=["城市"])
-        return df
+    def _rename_sources(self, raw_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        一次 rename 将每个输出字段实际使用的来源列重命名为输出字段名，
+        之后各阶段只按输出字段名处理，不再区分中英文列名
 
-    def _process_benefits(self, df: pd.DataFrame) -> pd.DataFrame:
-        """处理福利字段，转换为boolean类型"""
-        benefit_cols = {
-            "benefit_pension": ["养老金", "养老"],
-            "benefit_annual_leave": ["年假", "带薪年假"],
-            "benefit_health_ins": ["医疗", "医保", "医疗保险"],
-            "benefit_other": ["其他", "其他福利"]
+        结果与输入共享数据（不复制），各阶段只读不写
+        """
+        sources = {
+            target: next((col for col in candidates if col in raw_df.columns), None)
+            for target, candidates in self._SOURCE_MAP.items()
         }
+        # 与输出字段同名但未被选为来源的列（如 workload 让位于 工作负荷）先丢弃，避免重命名后出现重复列
+        stale = [target for target, source in sources.items() if source != target and target in raw_df.columns]
+        renames = {source: target for target, source in sources.items() if source not in (None, target)}
+        if not stale and not renames:
+            # 列名已是输出字段名（上游已完成重命名）时直接使用输入，不再构造新的 DataFrame
+            return raw_df
+        df = raw_df.drop(columns=stale) if stale else raw_df
+        return df.rename(columns=renames, copy=False)
+
+    def _standardize_datetime(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """
+        统一提交时间为 datetime64 类型（导出 CSV 时以 date_format=SUBMIT_TIME_FORMAT 写为 YYYY-MM-DD HH:MM:SS）
+
+        后续阶段均在 datetime64 上进行，不转回字符串
+        """
+        return {"submit_time": pd.to_datetime(df["submit_time"], format="mixed", errors="coerce")}
+
+    def _standardize_id(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """标准化ID字段为整数（输出统一为 Int64：提供的 ID 可能含 NULL）"""
+        if "id" in df.columns:
+            return {"id": pd.to_numeric(df["id"], errors="coerce").astype("Int64")}
+        # 生成的 ID 直接由连续 int64 数组包装，无需 to_numeric
+        return {"id": pd.Series(pd.array(np.arange(1, len(df) + 1, dtype=np.int64), dtype="Int64"), index=df.index)}
+
+    def _process_numerics(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """
+        处理全部数值字段：剥离单位、替换字面量后转为数值
+
+        NULL / 未知 / 保密 / — 等非数值标记由 to_numeric 统一转为 NaN，无需逐个剥离
+
+        约束（不在此处强制，越界值通过 data_quality_flag 标记）：
+        年龄 16-200，工作年限 0-50，满意度 0-6，工作负荷 1-10，任期 0-50，
+        月收入 0-35000（负数转为NULL），均允许NULL
+        """
+        columns = {}
+        for target, units, literals in self._NUMERIC_FIELDS:
+            if target not in df.columns:
+                continue
+
+            series = df[target]
+            if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                # 已是数值类型（如可空整数、定长 numpy 数值），没有单位可剥离，跳过字符串处理
+                columns[target] = series.astype("float64")
+                continue
+            if not isinstance(series.dtype, pd.StringDtype):
+                # object 列可能混有数字，统一转为 str；string 类型直接使用（NULL 保持为 <NA>）
+                series = series.astype(str)
+
+            # 先剥离单位，使 15K元 等写法的 K 位于末尾
+            for unit in units:
+                series = series.str.replace(unit, "", regex=False)
+            series = series.str.replace(self._THOUSANDS_RE, "e3", regex=True)
+            if literals:
+                series = series.replace(literals)
+            # 统一为 float64（NULL 为 NaN），可空整数等扩展类型输入也得到普通布尔比较结果
+            columns[target] = pd.to_numeric(series, errors="coerce").astype("float64")
 
-        for col_name, keywords in benefit_cols.items():
-            # 查找对应的中文列名
-            source_col = None
-            for keyword in keywords:
-                if keyword in df.columns:
-                    source_col = keyword
-                    break
-
-            if source_col is not None:
-                df[col_name] = df[source_col].fillna(False).astype(bool)
-            else:
-                # 如果没有原始列，初始化为False
-                df[col_name] = False
-
-        return df
-
-    def _process_other_notes(self, df: pd.DataFrame) -> pd.DataFrame:
-        """处理备注字段，从性别列或其他字段提取备注信息"""
-        # 处理备注中的特殊标记
+        # 负数转为NULL
+        if "monthly_income" in columns:
+            columns["monthly_income"] = columns["monthly_income"].where(columns["monthly_income"] >= 0)
+
+        return columns
+
+    @staticmethod
+    def _remap_categorical(
+        series: pd.Series,
+        lookup: pd.Series,
+        default: Optional[str],
+        missing: str,
+        dtype: Optional[pd.CategoricalDtype] = None
+    ) -> pd.Series:
+        """
+        按类别映射取值：去重后的 k 个类别一次 reindex 查表，再按类别编码取结果，不逐行映射 object 数组
+
+        default 为未命中映射的取值（None 表示保持原值），missing 为缺失值（NULL）的取值；
+        dtype 为空时，结果类别取映射后出现的全部取值
+        """
+        cat = series.astype("category").cat
+        categories = cat.categories.to_numpy(dtype=object)
+        targets = lookup.reindex(cat.categories).to_numpy(dtype=object)
+        unmatched = pd.isna(targets)
+        targets[unmatched] = categories[unmatched] if default is None else default
+        # 末尾追加缺失值的取值：NULL 的类别编码为 -1，正好取到最后一个
+        targets = np.append(targets, missing)
+        if dtype is None:
+            dtype = pd.CategoricalDtype(pd.Categorical(targets).categories)
+        target_codes = dtype.categories.get_indexer(targets)
+        codes = target_codes[cat.codes.to_numpy()]
+        return pd.Series(pd.Categorical.from_codes(codes, dtype=dtype), index=series.index)
+
+    def _mapping_lookup(self, name: str, *fallbacks: str) -> Tuple[pd.Series, pd.CategoricalDtype]:
+        """
+        返回映射表 self.<name> 的 pd.Series 形式，以及标准化后的类别（映射取值 + fallbacks）
+
+        读取实例上实际生效的映射表（子类或实例覆盖后同样生效）；
+        映射表内容未变化时复用缓存，不在每次调用时重新构造
+        """
+        mapping = getattr(self, name)
+        cached = self._lookup_cache.get(name)
+        if cached is None or cached[0] != mapping:
+            categories = pd.CategoricalDtype(list(dict.fromkeys([*mapping.values(), *fallbacks])))
+            cached = (dict(mapping), pd.Series(mapping, dtype=object), categories)
+            self._lookup_cache[name] = cached
+        return cached[1], cached[2]
+
+    def _standardize_dept(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """标准化部门字段（未命中映射的部门名称保持原值）"""
+        if "dept" not in df.columns:
+            return {}
+        lookup, _ = self._mapping_lookup("DEPT_MAPPING")
+        return {"dept": self._remap_categorical(df["dept"], lookup, None, "其他")}
+
+    def _standardize_gender(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """标准化性别字段为 male/female/unknown"""
+        if "gender" not in df.columns:
+            return {}
+        lookup, dtype = self._mapping_lookup("GENDER_MAPPING", "unknown")
+        return {"gender": self._remap_categorical(df["gender"], lookup, "unknown", "unknown", dtype)}
+
+    def _standardize_education(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """标准化教育程度字段，MBA映射为硕士（NULL 为未知，未命中为其他）"""
+        if "edu" not in df.columns:
+            return {}
+        lookup, dtype = self._mapping_lookup("EDU_MAPPING", "其他", "未知")
+        return {"edu": self._remap_categorical(df["edu"], lookup, "其他", "未知", dtype)}
+
+    def _standardize_emp_status(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """标准化雇佣状态字段（NULL 为未知，未命中为其他）"""
+        if "emp_status" not in df.columns:
+            return {}
+        lookup, dtype = self._mapping_lookup("EMP_STATUS_MAPPING", "其他", "未知")
+        return {"emp_status": self._remap_categorical(df["emp_status"], lookup, "其他", "未知", dtype)}
+
+    def _standardize_city(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """标准化城市字段为中文（处理英文名、大小写、空格等写法）"""
+        if "city" not in df.columns:
+            return {}
+        lookup, dtype = self._mapping_lookup("CITY_MAPPING", "未知城市")
+        return {"city": self._remap_categorical(df["city"], lookup, "未知城市", "未知城市", dtype)}
+
+    def _process_benefits(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """
+        处理福利字段，转换为boolean类型
+
+        没有原始列的福利字段取标量 False，构造 DataFrame 时统一广播；
+        NULL 在取数组时直接填为 False，不经过 object 列的 fillna
+        """
+        present = [col_name for col_name in self._BENEFIT_FIELDS if col_name in df.columns]
+        columns: Dict[str, Any] = dict.fromkeys(self._BENEFIT_FIELDS, False)
+        if not present:
+            return columns
+
+        for col_name in present:
+            values = df[col_name].to_numpy(dtype=object, na_value=False).astype(bool)
+            columns[col_name] = pd.Series(values, index=df.index)
+
+        return columns
+
+    def _process_other_notes(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """处理备注字段：一次正则扫描去除占位符与括注标记，NULL 转为空字符串"""
         if "other_notes" in df.columns:
-            df["other_notes"] = df["other_notes"].astype(str).str.replace("—", "").replace("nan", "").replace("其他〖", "").replace("〗", "").replace("测试", "测试")
-            df["other_notes"] = df["other_notes"].fillna("")
-        elif "备注" in df.columns:
-            df["other_notes"] = df["备注"].astype(str).str.replace("—", "").replace("nan", "").replace("其他〖", "").replace("〗", "").replace("测试", "测试")
-            df["other_notes"] = df["other_notes"].fillna("")
-            df = df.drop(columns=["备注"])
-        else:
-            df["other_notes"] = ""
-        return df
+            # string 类型保留 NULL 为 <NA>（不会变成字面量 "nan"/"None"），去除标记后统一填充
+            return {
+                "other_notes": df["other_notes"].astype("string")
+                .str.replace(self._NOTES_MARK_RE, "", regex=True)
+                .fillna("")
+            }
+        return {"other_notes": ""}
 
     def _detect_duplicates(self, df: pd.DataFrame) -> pd.DataFrame:
         """检测重复记录并标记"""
-        df["is_duplicate"] = False
-        if df.duplicated(subset=["submit_time", "age", "total_exp", "dept"]).any():
-            df["is_duplicate"] = df.duplicated(subset=["submit_time", "age", "total_exp", "dept"], keep="first")
+        df["is_duplicate"] = df.duplicated(subset=["submit_time", "age", "total_exp", "dept"], keep="first")
         return df
 
     def _add_data_quality_flags(self, df: pd.DataFrame) -> pd.DataFrame:
-        """添加数据质量标记"""
-        df["data_quality_flag"] = "正常"
-
-        # 收入缺失
-        df.loc[df["monthly_income"].isna() & (df["data_quality_flag"] == "正常"), "data_quality_flag"] = "收入缺失"
-
-        # 关键字段缺失
-        df.loc[(df["overall_satis"].isna() | df["workload"].isna()) & (df["data_quality_flag"] == "正常"), "data_quality_flag"] = "关键字段缺失"
-
-        # 逻辑校验：学生
-        df.loc[(df["emp_status"] == "非员工") & (df["age"] < 18) & (df["emp_status"].shift(1) != "非员工") & (df["data_quality_flag"] == "正常"), "data_quality_flag"] = "逻辑校验_学生"
-
-        # 逻辑校验：退休
-        df.loc[(df["emp_status"] == "非员工") & (df["age"] >= 60) & (df["emp_status"].shift(1) != "非员工") & (df["data_quality_flag"] == "正常"), "data_quality_flag"] = "逻辑校验_退休"
-
-        # 异常值：年龄 > 70 或工作负荷 > 10
-        df.loc[(df["age"] > 70) | (df["workload"] > 10), "data_quality_flag"] = "异常值_收入负数_工作负荷越界"
-
-        # 测试数据（优先级最高）
-        df.loc[df["dept"] == "测试部门", "data_quality_flag"] = "测试数据"
-
-        # 重复记录（优先级最高）
-        df.loc[df["is_duplicate"], "data_quality_flag"] = "重复记录"
-
+        """
+        添加数据质量标记（条件按优先级从高到低排列，取第一个满足的条件）
+
+        直接生成 int8 类别编码，结果存为 category，不生成逐行的标记字符串；
+        数值字段已统一为 float64，条件直接在 numpy 数组上计算，不逐个构造带索引的 Series
+        """
+        age = df["age"].to_numpy()
+        workload = df["workload"].to_numpy()
+        # 分类字段在 category 编码上比较后再取数组
+        non_employee = (df["emp_status"] == "非员工").to_numpy()
+        conditions = [
+            # 重复记录（优先级最高）
+            df["is_duplicate"].to_numpy(),
+            # 测试数据
+            (df["dept"] == "测试部门").to_numpy(),
+            # 异常值：年龄 > 70 或工作负荷 > 10
+            (age > 70) | (workload > 10),
+            # 收入缺失
+            np.isnan(df["monthly_income"].to_numpy()),
+            # 关键字段缺失
+            np.isnan(df["overall_satis"].to_numpy()) | np.isnan(workload),
+            # 逻辑校验：学生
+            non_employee & (age < 18),
+            # 逻辑校验：退休
+            non_employee & (age >= 60),
+        ]
+        # 第 i 个条件对应 _QUALITY_FLAG_CATS 的第 i 个类别，默认值为最后一个类别"正常"；
+        # 按优先级从低到高依次写入，高优先级覆盖低优先级，效果同 np.select，但不为每个条件构造整列的候选值数组
+        codes = np.full(len(df), len(conditions), dtype=np.int8)
+        for code in range(len(conditions) - 1, -1, -1):
+            codes[conditions[code]] = code
+        df["data_quality_flag"] = pd.Categorical.from_codes(codes, dtype=self._QUALITY_FLAG_CATS)
         return df
 
     def _select_and_order_columns(self, df: pd.DataFrame) -> pd.DataFrame:
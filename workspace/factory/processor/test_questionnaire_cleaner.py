@@ -5,28 +5,50 @@ QuestionnaireCleaner 集成测试
 """
 
 import pytest
+import numpy as np
 import pandas as pd
-import sys
-from pathlib import Path
-
-# 添加父目录到 Python 路径以导入被测试模块
-processor_dir = Path(__file__).parent
-sys.path.insert(0, str(processor_dir))
+from pandas.testing import assert_frame_equal, assert_series_equal
 
+# 模块路径由 factory/conftest.py 统一配置
 from questionnaire_cleaner import QuestionnaireCleaner
 
+# 原始问卷的 12 个基础列，以及手工构造测试数据时共用的列类型
+_RAW_COLUMNS = (
+    "提交时间", "年龄", "工作年限", "所属部门", "满意度", "工作负荷",
+    "任期", "月收入", "性别", "教育程度", "雇佣状态", "城市"
+)
+_NUMERIC_DTYPES = {
+    "年龄": "Int64", "工作年限": "Int64", "满意度": "Int64",
+    "工作负荷": "Int64", "任期": "Float64", "月收入": "Int64"
+}
+_CATEGORY_DTYPES = {col: "category" for col in ("所属部门", "性别", "教育程度", "雇佣状态", "城市")}
+# 基准正常记录（不含提交时间），各用例在其上覆盖若干字段
+_BASE_RECORD = {
+    "年龄": 25,
+    "工作年限": 3,
+    "所属部门": "研发部",
+    "满意度": 5,
+    "工作负荷": 7,
+    "任期": 2.5,
+    "月收入": 15000,
+    "性别": "男",
+    "教育程度": "本科",
+    "雇佣状态": "在职",
+    "城市": "北京"
+}
+
 
 class TestQuestionnaireCleanerIntegration:
     """QuestionnaireCleaner 集成测试类"""
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def cleaner(self):
-        """创建 QuestionnaireCleaner 实例"""
+        """创建 QuestionnaireCleaner 实例（模块内共享）"""
         return QuestionnaireCleaner()
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def sample_raw_data(self):
-        """创建样本原始数据 DataFrame"""
+        """创建样本原始数据 DataFrame（模块内共享，cleaner.process 不修改输入）"""
         data = {
             "提交时间": [
                 "2025-01-15 10:30:00",
@@ -35,59 +57,54 @@ class TestQuestionnaireCleanerIntegration:
                 "2025/01/18 16:45:00",
                 "invalid_datetime"
             ],
-            "年龄": [25, 30, 45, None, 150],
-            "工作年限": [3, 8, 15, 1.5, None],
-            "所属部门": ["研发部", "销售部", "财务部", None, "测试部门"],
-            "满意度": [5, 4, 3, None, 2],
-            "工作负荷": [7, 8, 5, None, 15],
-            "任期": [2.5, 6, 10, 0.5, None],
-            "月收入": [15000, 20000, 25000, -5000, None],
-            "性别": ["男", "女", None, "其他", "未知"],
-            "教育程度": ["本科", "硕士", "MBA", "博士", "其他"],
-            "雇佣状态": ["在职", "在职", "实习生", "退休", "学生"],
-            "城市": ["北京", "上海", None, "深圳", "成都"],
-            "养老金": [True, False, True, False, True],
-            "年假": [False, True, True, False, False],
-            "医疗": [True, True, False, False, True],
-            "其他福利": [False, False, False, True, False],
+            "年龄": pd.array([25, 30, 45, None, 150], dtype="Int64"),
+            "工作年限": pd.array([3, 8, 15, 1.5, None], dtype="Float64"),
+            "所属部门": pd.Categorical(["研发部", "销售部", "财务部", None, "测试部门"]),
+            "满意度": pd.array([5, 4, 3, None, 2], dtype="Int64"),
+            "工作负荷": pd.array([7, 8, 5, None, 15], dtype="Int64"),
+            "任期": pd.array([2.5, 6, 10, 0.5, None], dtype="Float64"),
+            "月收入": pd.array([15000, 20000, 25000, -5000, None], dtype="Int64"),
+            "性别": pd.Categorical(["男", "女", None, "其他", "未知"]),
+            "教育程度": pd.Categorical(["本科", "硕士", "MBA", "博士", "其他"]),
+            "雇佣状态": pd.Categorical(["在职", "在职", "实习生", "退休", "学生"]),
+            "城市": pd.Categorical(["北京", "上海", None, "深圳", "成都"]),
+            "养老金": pd.array([True, False, True, False, True], dtype="boolean"),
+            "年假": pd.array([False, True, True, False, False], dtype="boolean"),
+            "医疗": pd.array([True, True, False, False, True], dtype="boolean"),
+            "其他福利": pd.array([False, False, False, True, False], dtype="boolean"),
             "备注": ["正常", "", None, "测试数据", "其他信息"]
         }
-        df = pd.DataFrame(data)
-        # 添加缺失的福利列（如果原始数据中不包含这些列）
-        for col in ["养老金", "年假", "医疗", "其他福利"]:
-            if col not in df.columns:
-                df[col] = False
-        return df
-
-    @pytest.fixture
-    def duplicate_data(self):
-        """创建包含重复记录的数据"""
-        data = {
-            "提交时间": ["2025-01-15 10:30:00", "2025-01-15 10:30:00", "2025-01-16 10:30:00"],
-            "年龄": [25, 25, 30],
-            "工作年限": [3, 3, 5],
-            "所属部门": ["研发部", "研发部", "销售部"],
-            "满意度": [5, 5, 4],
-            "工作负荷": [7, 7, 6],
-            "任期": [2.5, 2.5, 3],
-            "月收入": [15000, 15000, 18000],
-            "性别": ["男", "男", "女"],
-            "教育程度": ["本科", "本科", "硕士"],
-            "雇佣状态": ["在职", "在职", "在职"],
-            "城市": ["北京", "北京", "上海"],
-            "养老金": [True, True, False],
-            "年假": [False, False, True],
-            "医疗": [True, True, True],
-            "其他福利": [False, False, False],
-            "备注": ["", "", ""]
-        }
         return pd.DataFrame(data)
 
+    @pytest.fixture(scope="module")
+    def sample_result(self, cleaner, sample_raw_data):
+        """样本数据的清洗结果（模块内只处理一次，各测试只读）"""
+        return cleaner.process(sample_raw_data)
+
+    @pytest.fixture(scope="module")
+    def duplicate_data(self):
+        """创建包含重复记录的数据（结构化数组一次构造，无缺失值，数值列保持定长 numpy 类型）"""
+        dtype = np.dtype([
+            ("提交时间", "U19"), ("年龄", "i2"), ("工作年限", "i2"), ("所属部门", "U8"),
+            ("满意度", "i2"), ("工作负荷", "i2"), ("任期", "f8"), ("月收入", "i4"),
+            ("性别", "U2"), ("教育程度", "U4"), ("雇佣状态", "U4"), ("城市", "U4"),
+            ("养老金", "?"), ("年假", "?"), ("医疗", "?"), ("其他福利", "?"), ("备注", "U8")
+        ])
+        records = np.array([
+            ("2025-01-15 10:30:00", 25, 3, "研发部", 5, 7, 2.5, 15000, "男", "本科", "在职", "北京",
+             True, False, True, False, ""),
+            ("2025-01-15 10:30:00", 25, 3, "研发部", 5, 7, 2.5, 15000, "男", "本科", "在职", "北京",
+             True, False, True, False, ""),
+            ("2025-01-16 10:30:00", 30, 5, "销售部", 4, 6, 3.0, 18000, "女", "硕士", "在职", "上海",
+             False, True, True, False, ""),
+        ], dtype=dtype)
+        return pd.DataFrame.from_records(records).astype(_CATEGORY_DTYPES)
+
     # ========== 端到端测试 ==========
 
-    def test_end_to_end_processing(self, cleaner, sample_raw_data):
+    def test_end_to_end_processing(self, sample_result, sample_raw_data):
         """测试完整的端到端数据处理流程"""
-        result = cleaner.process(sample_raw_data)
+        result = sample_result
 
         # 验证输出结构
         assert result is not None
@@ -104,146 +121,196 @@ class TestQuestionnaireCleanerIntegration:
         for col in required_columns:
             assert col in result.columns, f"缺少必需列: {col}"
 
-    def test_schema_compliance(self, cleaner, sample_raw_data):
+    def test_schema_compliance(self, sample_result):
         """测试输出数据符合契约定义的 schema"""
-        result = cleaner.process(sample_raw_data)
+        result = sample_result
 
         # 验证数据类型
         assert pd.api.types.is_integer_dtype(result["id"])
-        assert pd.api.types.is_object_dtype(result["submit_time"])  # object类型存储字符串和NaN
+        assert pd.api.types.is_datetime64_any_dtype(result["submit_time"])  # 无效时间为 NaT
         assert pd.api.types.is_numeric_dtype(result["age"])  # float64 允许 NULL
         assert pd.api.types.is_string_dtype(result["dept"])
         assert pd.api.types.is_string_dtype(result["gender"])
+        assert isinstance(result["gender"].dtype, pd.CategoricalDtype)  # 低基数字段存为 category
+        assert all(isinstance(result[col].dtype, pd.CategoricalDtype)
+                   for col in ["dept", "edu", "emp_status", "city", "data_quality_flag"])
         assert pd.api.types.is_bool_dtype(result["benefit_pension"])
         assert pd.api.types.is_bool_dtype(result["is_duplicate"])
 
+    def test_english_column_names(self, cleaner, sample_raw_data):
+        """测试英文列名输入（无需重命名）与中文列名输入的清洗结果一致"""
+        english = dict(zip(_RAW_COLUMNS, (
+            "submit_time", "age", "total_exp", "dept", "overall_satis", "workload",
+            "tenure", "monthly_income", "gender", "edu", "emp_status", "city"
+        )))
+        chinese_df = sample_raw_data[list(_RAW_COLUMNS)]
+        english_df = chinese_df.rename(columns=english)
+
+        assert_frame_equal(cleaner.process(english_df), cleaner.process(chinese_df))
+
     # ========== 阶段1：元数据标准化测试 ==========
 
-    def test_datetime_standardization(self, cleaner, sample_raw_data):
+    def test_datetime_standardization(self, sample_result):
         """测试时间格式标准化"""
-        result = cleaner.process(sample_raw_data)
-
-        # 验证时间格式统一（排除无效时间）
-        valid_times = result[result["submit_time"] != "NaT"]["submit_time"]
-        for time_str in valid_times:
-            # 确保time_str是字符串类型
-            if pd.notna(time_str) and isinstance(time_str, str):
-                assert len(time_str) == 19  # YYYY-MM-DD HH:MM:SS
-                assert time_str[4] == "-"
-                assert time_str[7] == "-"
-                assert time_str[10] == " "
-                assert time_str[13] == ":"
-                assert time_str[16] == ":"
-
-    def test_id_generation(self, cleaner, sample_raw_data):
+        result = sample_result
+
+        # 验证多种时间格式被统一解析，无效时间转为 NaT
+        assert pd.api.types.is_datetime64_any_dtype(result["submit_time"])
+        assert result["submit_time"].iloc[0] == pd.Timestamp("2025-01-15 10:30:00")
+        assert result["submit_time"].iloc[3] == pd.Timestamp("2025-01-18 16:45:00")
+        assert pd.isna(result["submit_time"].iloc[4])
+
+        # 导出时格式为 YYYY-MM-DD HH:MM:SS
+        csv_lines = result[["submit_time"]].head(1).to_csv(
+            index=False, date_format=QuestionnaireCleaner.SUBMIT_TIME_FORMAT
+        ).splitlines()
+        assert csv_lines[1] == "2025-01-15 10:30:00"
+
+    def test_datetime_export_format_at_midnight(self, cleaner):
+        """测试整列均为零点时，导出格式仍包含时间部分"""
+        test_df = pd.DataFrame([_BASE_RECORD] * 2).assign(提交时间=["2025-01-15", "2025/01/16 00:00:00"])
+        result = cleaner.process(test_df)
+
+        csv_lines = result[["submit_time"]].to_csv(
+            index=False, date_format=QuestionnaireCleaner.SUBMIT_TIME_FORMAT
+        ).splitlines()
+        assert csv_lines[1:] == ["2025-01-15 00:00:00", "2025-01-16 00:00:00"]
+
+    def test_id_generation(self, sample_result):
         """测试ID字段生成和标准化"""
-        result = cleaner.process(sample_raw_data)
+        result = sample_result
 
         # 验证ID连续且为整数
         assert result["id"].notna().all()
-        assert list(result["id"]) == list(range(1, len(result) + 1))
+        np.testing.assert_array_equal(
+            result["id"].to_numpy(dtype=np.int64), np.arange(1, len(result) + 1, dtype=np.int64), strict=True
+        )
 
     # ========== 阶段2：数值字段处理测试 ==========
 
-    def test_age_processing(self, cleaner, sample_raw_data):
+    def test_age_processing(self, sample_result):
         """测试年龄字段处理"""
-        result = cleaner.process(sample_raw_data)
+        result = sample_result
 
         # 验证年龄为数值类型（允许NULL）
         assert pd.api.types.is_numeric_dtype(result["age"])
         assert result["age"].iloc[0] == 25
         assert pd.isna(result["age"].iloc[3])
 
-    def test_total_exp_processing(self, cleaner, sample_raw_data):
+    def test_total_exp_processing(self, sample_result):
         """测试工作年限处理"""
-        result = cleaner.process(sample_raw_data)
+        result = sample_result
 
         assert result["total_exp"].iloc[0] == 3.0
         assert result["total_exp"].iloc[3] == 1.5
         assert pd.isna(result["total_exp"].iloc[4])
 
-    def test_satisfaction_processing(self, cleaner, sample_raw_data):
+    def test_satisfaction_processing(self, sample_result):
         """测试满意度处理"""
-        result = cleaner.process(sample_raw_data)
+        result = sample_result
 
         assert result["overall_satis"].iloc[0] == 5
         assert pd.isna(result["overall_satis"].iloc[3])
 
-    def test_workload_processing(self, cleaner, sample_raw_data):
+    def test_workload_processing(self, sample_result):
         """测试工作负荷处理"""
-        result = cleaner.process(sample_raw_data)
+        result = sample_result
 
         assert result["workload"].iloc[0] == 7
         assert result["workload"].iloc[4] == 15  # 允许越界值，通过质量标记
 
-    def test_tenure_processing(self, cleaner, sample_raw_data):
+    def test_tenure_processing(self, sample_result):
         """测试任期处理"""
-        result = cleaner.process(sample_raw_data)
+        result = sample_result
 
         assert result["tenure"].iloc[0] == 2.5
         assert result["tenure"].iloc[3] == 0.5
 
-    def test_monthly_income_processing(self, cleaner, sample_raw_data):
+    def test_monthly_income_processing(self, sample_result):
         """测试月收入处理（负数转NULL）"""
-        result = cleaner.process(sample_raw_data)
+        result = sample_result
 
         # 验证负数被转为NULL
         assert result["monthly_income"].iloc[0] == 15000
         assert pd.isna(result["monthly_income"].iloc[3])  # 原值为 -5000
 
+    @pytest.mark.parametrize("dtype", [object, "string"])
+    def test_numeric_units_and_markers(self, cleaner, dtype):
+        """测试数值字段剥离单位、K 表示千、NULL/保密等标记转为NULL（object 与 string 类型输入一致）"""
+        test_df = pd.DataFrame([_BASE_RECORD] * 5).assign(
+            提交时间=["2025-01-15 10:30:00"] * 5,
+            年龄=pd.Series(["35岁", "二十八", "NULL", "40", "41"], dtype=dtype),
+            工作年限=pd.Series(["8年", "刚入职", None, "3", "4"], dtype=dtype),
+            满意度=pd.Series(["4分", "5满意", "未知", "3", None], dtype=dtype),
+            月收入=pd.Series(["15000元", "12K", "保密", "-5000", "15K元"], dtype=dtype)
+        )
+        result = cleaner.process(test_df)
+
+        assert_series_equal(result["age"], pd.Series([35.0, 28.0, np.nan, 40.0, 41.0]), check_names=False)
+        assert_series_equal(result["total_exp"], pd.Series([8.0, 0.0, np.nan, 3.0, 4.0]), check_names=False)
+        assert_series_equal(result["overall_satis"], pd.Series([4.0, 5.0, np.nan, 3.0, np.nan]), check_names=False)
+        assert_series_equal(
+            result["monthly_income"], pd.Series([15000.0, 12000.0, np.nan, np.nan, 15000.0]), check_names=False
+        )
+
+    @pytest.mark.parametrize("source_col", ["年龄", "age"])
+    def test_age_literal_for_both_sources(self, cleaner, source_col):
+        """测试年龄字面量（二十八）无论来源列为中文列名还是英文列名，均解析为数值"""
+        test_df = pd.DataFrame(
+            [("2025-01-15 10:30:00", "二十八", 3, "研发部", 5, 7, 2.5, 15000, "男", "本科", "在职", "北京")],
+            columns=_RAW_COLUMNS
+        ).rename(columns={"年龄": source_col})
+        result = cleaner.process(test_df)
+
+        assert result["age"].iloc[0] == 28
+
     # ========== 阶段3：分类字段标准化测试 ==========
 
-    def test_gender_standardization(self, cleaner, sample_raw_data):
+    def test_gender_standardization(self, sample_result):
         """测试性别标准化"""
-        result = cleaner.process(sample_raw_data)
+        result = sample_result
 
-        assert result["gender"].iloc[0] == "male"
-        assert result["gender"].iloc[1] == "female"
-        assert result["gender"].iloc[2] == "unknown"  # NULL -> unknown
-        assert result["gender"].iloc[3] == "other"
-        assert result["gender"].iloc[4] == "unknown"
+        # NULL 与未知取值均归为 unknown
+        expected = pd.Series(["male", "female", "unknown", "other", "unknown"], dtype=result["gender"].dtype)
+        assert_series_equal(result["gender"], expected, check_names=False)
 
-    def test_education_standardization(self, cleaner, sample_raw_data):
+    def test_education_standardization(self, sample_result):
         """测试教育程度标准化（MBA映射为硕士）"""
-        result = cleaner.process(sample_raw_data)
+        result = sample_result
 
-        assert result["edu"].iloc[0] == "本科"
-        assert result["edu"].iloc[1] == "硕士"
-        assert result["edu"].iloc[2] == "硕士"  # MBA -> 硕士
-        assert result["edu"].iloc[3] == "博士"
+        # MBA -> 硕士
+        expected = pd.Series(["本科", "硕士", "硕士", "博士", "其他"], dtype=result["edu"].dtype)
+        assert_series_equal(result["edu"], expected, check_names=False)
 
-    def test_emp_status_standardization(self, cleaner, sample_raw_data):
+    def test_emp_status_standardization(self, sample_result):
         """测试雇佣状态标准化"""
-        result = cleaner.process(sample_raw_data)
+        result = sample_result
 
-        assert result["emp_status"].iloc[0] == "在职"
-        assert result["emp_status"].iloc[1] == "在职"
-        assert result["emp_status"].iloc[2] == "实习生"
-        assert result["emp_status"].iloc[3] == "非员工"  # 退休 -> 非员工
-        assert result["emp_status"].iloc[4] == "非员工"  # 学生 -> 非员工
+        # 退休、学生 -> 非员工
+        expected = pd.Series(["在职", "在职", "实习生", "非员工", "非员工"], dtype=result["emp_status"].dtype)
+        assert_series_equal(result["emp_status"], expected, check_names=False)
 
-    def test_city_standardization(self, cleaner, sample_raw_data):
+    def test_city_standardization(self, sample_result):
         """测试城市标准化"""
-        result = cleaner.process(sample_raw_data)
+        result = sample_result
 
-        assert result["city"].iloc[0] == "北京"
-        assert result["city"].iloc[1] == "上海"
-        assert result["city"].iloc[2] == "未知城市"  # NULL -> 未知城市
-        assert result["city"].iloc[3] == "深圳"
-        assert result["city"].iloc[4] == "成都"
+        # NULL -> 未知城市
+        expected = pd.Series(["北京", "上海", "未知城市", "深圳", "成都"], dtype=result["city"].dtype)
+        assert_series_equal(result["city"], expected, check_names=False)
 
-    def test_dept_standardization(self, cleaner, sample_raw_data):
+    def test_dept_standardization(self, sample_result):
         """测试部门标准化"""
-        result = cleaner.process(sample_raw_data)
+        result = sample_result
 
-        assert result["dept"].iloc[0] == "研发部"
-        assert result["dept"].iloc[3] == "其他"  # NULL -> 其他
+        # 研发部 -> 研发；未命中映射的部门保持原值；NULL -> 其他
+        expected = pd.Series(["研发", "销售", "财务部", "其他", "测试部门"], dtype="category")
+        assert_series_equal(result["dept"], expected, check_names=False)
 
     # ========== 阶段4：福利字段处理测试 ==========
 
-    def test_benefits_boolean_conversion(self, cleaner, sample_raw_data):
+    def test_benefits_boolean_conversion(self, sample_result):
         """测试福利字段转换为 boolean"""
-        result = cleaner.process(sample_raw_data)
+        result = sample_result
 
         # 验证所有福利字段都是 boolean 类型
         benefit_cols = ["benefit_pension", "benefit_annual_leave", "benefit_health_ins", "benefit_other"]
@@ -251,14 +318,19 @@ class TestQuestionnaireCleanerIntegration:
             assert pd.api.types.is_bool_dtype(result[col])
 
         # 验证值
-        assert result["benefit_pension"].iloc[0] == True
-        assert result["benefit_annual_leave"].iloc[1] == True
+        expected = pd.DataFrame({
+            "benefit_pension": [True, False, True, False, True],
+            "benefit_annual_leave": [False, True, True, False, False],
+            "benefit_health_ins": [True, True, False, False, True],
+            "benefit_other": [False, False, False, True, False]
+        })
+        assert_frame_equal(result[benefit_cols], expected)
 
     # ========== 阶段5：备注字段处理测试 ==========
 
-    def test_other_notes_processing(self, cleaner, sample_raw_data):
+    def test_other_notes_processing(self, sample_result):
         """测试备注字段处理"""
-        result = cleaner.process(sample_raw_data)
+        result = sample_result
 
         assert result["other_notes"].iloc[0] == "正常"
         assert result["other_notes"].iloc[1] == ""  # 空字符串保持
@@ -279,72 +351,6 @@ class TestQuestionnaireCleanerIntegration:
 
     # ========== 阶段7：数据质量标记测试 ==========
 
-    def test_quality_flag_income_missing(self, cleaner, sample_raw_data):
-        """测试收入缺失质量标记"""
-        # 创建测试数据，收入缺失但其他条件满足
-        test_df = pd.DataFrame({
-            "提交时间": ["2025-01-15 10:30:00"],
-            "年龄": [25],
-            "工作年限": [3],
-            "所属部门": ["研发部"],
-            "满意度": [5],
-            "工作负荷": [7],
-            "任期": [2.5],
-            "月收入": [None],  # 收入缺失
-            "性别": ["男"],
-            "教育程度": ["本科"],
-            "雇佣状态": ["在职"],
-            "城市": ["北京"]
-        })
-        result = cleaner.process(test_df)
-
-        # 月收入缺失的记录应该被标记
-        assert result["data_quality_flag"].iloc[0] == "收入缺失"
-
-    def test_quality_flag_key_fields_missing(self, cleaner, sample_raw_data):
-        """测试关键字段缺失质量标记"""
-        # 创建关键字段缺失的测试数据
-        test_df = pd.DataFrame({
-            "提交时间": ["2025-01-15 10:30:00"],
-            "年龄": [25],
-            "工作年限": [3],
-            "所属部门": ["研发部"],
-            "满意度": [None],  # 满意度缺失
-            "工作负荷": [None],  # 工作负荷缺失
-            "任期": [2.5],
-            "月收入": [15000],  # 收入存在
-            "性别": ["男"],
-            "教育程度": ["本科"],
-            "雇佣状态": ["在职"],
-            "城市": ["北京"]
-        })
-        result = cleaner.process(test_df)
-
-        # 缺少满意度或工作负荷的记录应该被标记
-        assert result["data_quality_flag"].iloc[0] == "关键字段缺失"
-
-    def test_quality_flag_test_data(self, cleaner, sample_raw_data):
-        """测试测试数据质量标记"""
-        # 创建专门的测试数据
-        test_df = pd.DataFrame({
-            "提交时间": ["2025-01-15 10:30:00"],
-            "年龄": [25],
-            "工作年限": [3],
-            "所属部门": ["测试部门"],
-            "满意度": [5],
-            "工作负荷": [7],
-            "任期": [2.5],
-            "月收入": [15000],
-            "性别": ["男"],
-            "教育程度": ["本科"],
-            "雇佣状态": ["在职"],
-            "城市": ["北京"]
-        })
-        result = cleaner.process(test_df)
-
-        # 测试部门应该被标记
-        assert result["data_quality_flag"].iloc[0] == "测试数据"
-
     def test_quality_flag_duplicate_records(self, cleaner, duplicate_data):
         """测试重复记录质量标记"""
         result = cleaner.process(duplicate_data)
@@ -352,55 +358,44 @@ class TestQuestionnaireCleanerIntegration:
         # 重复记录应该被标记
         assert result["data_quality_flag"].iloc[1] == "重复记录"
 
-    def test_quality_flag_anomaly_values(self, cleaner, sample_raw_data):
-        """测试异常值质量标记"""
-        # 创建异常值记录（年龄 > 70）
-        anomaly_df = pd.DataFrame({
-            "提交时间": ["2025-01-15 10:30:00"],
-            "年龄": [150],  # 年龄 > 70
-            "工作年限": [3],
-            "所属部门": ["研发部"],
-            "满意度": [5],
-            "工作负荷": [7],
-            "任期": [2.5],
-            "月收入": [15000],
-            "性别": ["男"],
-            "教育程度": ["本科"],
-            "雇佣状态": ["在职"],
-            "城市": ["北京"]
-        })
-        result = cleaner.process(anomaly_df)
-
-        # 年龄 > 70 或工作负荷 > 10 的记录应该被标记
-        assert "异常值" in result["data_quality_flag"].iloc[0]
+    # 每个用例在基准正常记录上覆盖若干字段；提交时间按行错开，避免批量处理时被判为重复
+    QUALITY_FLAG_CASES = [
+        ({"月收入": None}, "收入缺失"),
+        ({"满意度": None, "工作负荷": None}, "关键字段缺失"),
+        ({"所属部门": "测试部门"}, "测试数据"),
+        ({"年龄": 150}, "异常值_收入负数_工作负荷越界"),  # 年龄 > 70
+        ({}, "正常"),
+        # 同时满足多个条件时取优先级最高的标记
+        ({"月收入": None, "满意度": None}, "收入缺失"),
+        ({"所属部门": "测试部门", "年龄": 150}, "测试数据"),
+        # 逻辑校验：以下三条非员工记录相邻，每条都单独判断，不参考上一行
+        ({"雇佣状态": "学生", "年龄": 16}, "逻辑校验_学生"),
+        ({"雇佣状态": "学生", "年龄": 17}, "逻辑校验_学生"),
+        ({"雇佣状态": "退休", "年龄": 65}, "逻辑校验_退休"),
+    ]
+
+    @pytest.fixture(scope="module")
+    def quality_flag_result(self, cleaner):
+        """将全部质量标记用例合并为一个 DataFrame，只处理一次"""
+        rows = [
+            {"提交时间": f"2025-01-15 10:{30 + i}:00", **_BASE_RECORD, **overrides}
+            for i, (overrides, _) in enumerate(self.QUALITY_FLAG_CASES)
+        ]
+        test_df = pd.DataFrame(rows).astype(_NUMERIC_DTYPES)
+        return cleaner.process(test_df)
 
-    def test_quality_flag_normal_records(self, cleaner, sample_raw_data):
-        """测试正常记录质量标记"""
-        # 创建正常记录
-        normal_df = pd.DataFrame({
-            "提交时间": ["2025-01-15 10:30:00"],
-            "年龄": [25],
-            "工作年限": [3],
-            "所属部门": ["研发部"],
-            "满意度": [5],
-            "工作负荷": [7],
-            "任期": [2.5],
-            "月收入": [15000],
-            "性别": ["男"],
-            "教育程度": ["本科"],
-            "雇佣状态": ["在职"],
-            "城市": ["北京"]
-        })
-        result = cleaner.process(normal_df)
+    @pytest.mark.parametrize("case", range(len(QUALITY_FLAG_CASES)))
+    def test_quality_flags(self, quality_flag_result, case):
+        """测试收入缺失、关键字段缺失、测试数据、异常值、逻辑校验与正常记录的质量标记及其优先级"""
+        _, expected_flag = self.QUALITY_FLAG_CASES[case]
 
-        # 第一条记录应该是正常的
-        assert result["data_quality_flag"].iloc[0] == "正常"
+        assert quality_flag_result["data_quality_flag"].iloc[case] == expected_flag
 
     # ========== 阶段8：字段选择与排序测试 ==========
 
-    def test_column_selection_and_ordering(self, cleaner, sample_raw_data):
+    def test_column_selection_and_ordering(self, sample_result):
         """测试字段选择和排序"""
-        result = cleaner.process(sample_raw_data)
+        result = sample_result
 
         # 验证列的顺序符合预期
         expected_order = [
@@ -414,15 +409,13 @@ class TestQuestionnaireCleanerIntegration:
 
         # 只验证实际存在的列的顺序
         actual_columns = [col for col in expected_order if col in result.columns]
-        assert list(result.columns) == actual_columns
+        assert result.columns.equals(pd.Index(actual_columns))
 
     # ========== 边界条件测试 ==========
 
     def test_empty_dataframe(self, cleaner):
         """测试空DataFrame处理"""
-        empty_df = pd.DataFrame(columns=["提交时间", "年龄", "工作年限", "所属部门", "满意度",
-                                         "工作负荷", "任期", "月收入", "性别", "教育程度",
-                                         "雇佣状态", "城市"])
+        empty_df = pd.DataFrame({col: [] for col in _RAW_COLUMNS}).astype({**_NUMERIC_DTYPES, **_CATEGORY_DTYPES})
         result = cleaner.process(empty_df)
 
         assert len(result) == 0
@@ -430,20 +423,10 @@ class TestQuestionnaireCleanerIntegration:
 
     def test_single_record(self, cleaner):
         """测试单条记录处理"""
-        single_df = pd.DataFrame({
-            "提交时间": ["2025-01-15 10:30:00"],
-            "年龄": [25],
-            "工作年限": [3],
-            "所属部门": ["研发部"],
-            "满意度": [5],
-            "工作负荷": [7],
-            "任期": [2.5],
-            "月收入": [15000],
-            "性别": ["男"],
-            "教育程度": ["本科"],
-            "雇佣状态": ["在职"],
-            "城市": ["北京"]
-        })
+        single_df = pd.DataFrame(
+            [("2025-01-15 10:30:00", 25, 3, "研发部", 5, 7, 2.5, 15000, "男", "本科", "在职", "北京")],
+            columns=_RAW_COLUMNS
+        )
 
         result = cleaner.process(single_df)
 
@@ -452,20 +435,7 @@ class TestQuestionnaireCleanerIntegration:
 
     def test_all_null_values(self, cleaner):
         """测试全部为NULL值的记录"""
-        null_df = pd.DataFrame({
-            "提交时间": [None],
-            "年龄": [None],
-            "工作年限": [None],
-            "所属部门": [None],
-            "满意度": [None],
-            "工作负荷": [None],
-            "任期": [None],
-            "月收入": [None],
-            "性别": [None],
-            "教育程度": [None],
-            "雇佣状态": [None],
-            "城市": [None]
-        })
+        null_df = pd.DataFrame([[None] * len(_RAW_COLUMNS)], columns=_RAW_COLUMNS)
 
         result = cleaner.process(null_df)
 
@@ -473,107 +443,142 @@ class TestQuestionnaireCleanerIntegration:
         assert result["gender"].iloc[0] == "unknown"
         assert result["city"].iloc[0] == "未知城市"
         assert result["dept"].iloc[0] == "其他"
+        assert result["edu"].iloc[0] == "未知"  # NULL -> 未知（区别于未命中映射的"其他"）
+        assert result["emp_status"].iloc[0] == "未知"
 
+    @pytest.mark.slow
     def test_large_dataset(self, cleaner):
         """测试大数据集处理性能"""
-        # 创建1000条记录
+        # 创建1000条记录：数值列用定长 numpy 数组，重复的字符串列用 category
+        n = 1000
+
+        def repeated(value):
+            return pd.Categorical.from_codes(np.zeros(n, dtype=np.int8), categories=[value])
+
         large_df = pd.DataFrame({
-            "提交时间": ["2025-01-15 10:30:00"] * 1000,
-            "年龄": [25] * 1000,
-            "工作年限": [3] * 1000,
-            "所属部门": ["研发部"] * 1000,
-            "满意度": [5] * 1000,
-            "工作负荷": [7] * 1000,
-            "任期": [2.5] * 1000,
-            "月收入": [15000] * 1000,
-            "性别": ["男"] * 1000,
-            "教育程度": ["本科"] * 1000,
-            "雇佣状态": ["在职"] * 1000,
-            "城市": ["北京"] * 1000
-        })
+            "提交时间": repeated("2025-01-15 10:30:00"),
+            "年龄": np.full(n, 25, dtype=np.int16),
+            "工作年限": np.full(n, 3, dtype=np.int16),
+            "所属部门": repeated("研发部"),
+            "满意度": np.full(n, 5, dtype=np.int16),
+            "工作负荷": np.full(n, 7, dtype=np.int16),
+            "任期": np.full(n, 2.5, dtype=np.float32),
+            "月收入": np.full(n, 15000, dtype=np.int32),
+            "性别": repeated("男"),
+            "教育程度": repeated("本科"),
+            "雇佣状态": repeated("在职"),
+            "城市": repeated("北京")
+        }, copy=False)
 
         result = cleaner.process(large_df)
 
         assert len(result) == 1000
         assert result["id"].iloc[-1] == 1000
+        # category 输入同样完成标准化
+        assert (result["dept"] == "研发").all()
+        assert (result["gender"] == "male").all()
 
     # ========== 映射配置测试 ==========
 
-    def test_gender_mapping_completeness(self, cleaner, sample_raw_data):
+    def test_gender_mapping_completeness(self, sample_result):
         """测试性别映射完整性"""
-        result = cleaner.process(sample_raw_data)
+        result = sample_result
 
         # 所有性别值都应该被映射到标准值
         valid_genders = {"male", "female", "other", "unknown"}
         for gender in result["gender"]:
             assert gender in valid_genders
 
-    def test_education_mapping_with_mba(self, cleaner, sample_raw_data):
+    def test_education_mapping_with_mba(self, sample_result):
         """测试教育程度映射包含MBA"""
-        result = cleaner.process(sample_raw_data)
+        result = sample_result
 
         # MBA应该被映射为硕士
         assert result["edu"].iloc[2] == "硕士"
 
-    def test_emp_status_mapping_special_cases(self, cleaner, sample_raw_data):
+    def test_emp_status_mapping_special_cases(self, sample_result):
         """测试雇佣状态映射特殊情况"""
-        result = cleaner.process(sample_raw_data)
+        result = sample_result
 
         # 退休和学生应该映射为非员工
         assert result["emp_status"].iloc[3] == "非员工"
         assert result["emp_status"].iloc[4] == "非员工"
 
+    def test_mapping_aliases(self, cleaner, sample_raw_data):
+        """测试公开映射表包含合并进来的别名写法（性别编码、英文城市名等）"""
+        assert {
+            alias: QuestionnaireCleaner.GENDER_MAPPING[alias] for alias in ("M", "1", "F", "2", "other", "unknown")
+        } == {"M": "male", "1": "male", "F": "female", "2": "female", "other": "other", "unknown": "unknown"}
+        assert {
+            alias: QuestionnaireCleaner.CITY_MAPPING[alias] for alias in ("Beijing", "Shanghai", "shang hai")
+        } == {"Beijing": "北京", "Shanghai": "上海", "shang hai": "上海"}
+        assert QuestionnaireCleaner.DEPT_MAPPING["R&D"] == "研发"
+
+        raw_df = sample_raw_data.assign(
+            性别=["1", "2", "M", "F", "other"],
+            城市=["Beijing", "shang hai", "Shanghai", "深圳", "Paris"]
+        )
+        result = cleaner.process(raw_df)
+        assert list(result["gender"]) == ["male", "female", "male", "female", "other"]
+        assert list(result["city"]) == ["北京", "上海", "上海", "深圳", "未知城市"]
+
+    def test_mapping_override(self, sample_raw_data):
+        """测试子类或实例覆盖映射表后生效"""
+
+        class VocationalCleaner(QuestionnaireCleaner):
+            EDU_MAPPING = {**QuestionnaireCleaner.EDU_MAPPING, "中专": "高中"}
+
+        raw_df = sample_raw_data.assign(教育程度=["中专", "本科", None, "小学", "MBA"])
+        subclass_result = VocationalCleaner().process(raw_df)
+        assert list(subclass_result["edu"]) == ["高中", "本科", "未知", "其他", "硕士"]
+
+        cleaner = QuestionnaireCleaner()
+        cleaner.process(sample_raw_data)  # 先按默认映射处理一次，覆盖后不应沿用缓存
+        cleaner.EMP_STATUS_MAPPING = {**QuestionnaireCleaner.EMP_STATUS_MAPPING, "退休": "返聘"}
+        instance_result = cleaner.process(sample_raw_data)
+        assert list(instance_result["emp_status"]) == ["在职", "在职", "实习生", "返聘", "非员工"]
+
     # ========== 数据完整性测试 ==========
 
-    def test_record_count_preservation(self, cleaner, sample_raw_data):
+    def test_record_count_preservation(self, sample_result, sample_raw_data):
         """测试记录数量保持不变"""
         original_count = len(sample_raw_data)
-        result = cleaner.process(sample_raw_data)
+        result = sample_result
 
         assert len(result) == original_count
 
-    def test_no_data_loss_in_transformation(self, cleaner, sample_raw_data):
+    def test_no_data_loss_in_transformation(self, sample_result, sample_raw_data):
         """测试数据转换过程中无数据丢失"""
-        result = cleaner.process(sample_raw_data)
+        result = sample_result
 
         # 验证原始数据中的关键信息都被保留
-        assert sum(result["age"].notna()) == sum(sample_raw_data["年龄"].notna())
-        assert sum(result["total_exp"].notna()) == sum(sample_raw_data["工作年限"].notna())
+        assert result["age"].count() == sample_raw_data["年龄"].count()
+        assert result["total_exp"].count() == sample_raw_data["工作年限"].count()
 
     # ========== 与契约合规性测试 ==========
 
-    def test_contract_id_not_null_constraint(self, cleaner, sample_raw_data):
+    def test_contract_id_not_null_constraint(self, sample_result):
         """测试ID字段not_null约束"""
-        result = cleaner.process(sample_raw_data)
+        result = sample_result
 
         assert result["id"].notna().all()
 
     def test_contract_age_range_constraint(self, cleaner, sample_raw_data):
         """测试年龄范围约束（允许极端值）"""
         # 创建极端年龄的记录
-        extreme_age_df = pd.DataFrame({
-            "提交时间": ["2025-01-15 10:30:00"],
-            "年龄": [150],  # 极端年龄
-            "工作年限": [3],
-            "所属部门": ["研发部"],
-            "满意度": [5],
-            "工作负荷": [7],
-            "任期": [2.5],
-            "月收入": [15000],
-            "性别": ["男"],
-            "教育程度": ["本科"],
-            "雇佣状态": ["在职"],
-            "城市": ["北京"]
-        })
+        extreme_age_df = pd.DataFrame(
+            [("2025-01-15 10:30:00", 150, 3, "研发部", 5, 7, 2.5, 15000, "男", "本科", "在职", "北京")],  # 极端年龄
+            columns=_RAW_COLUMNS
+        )
         result = cleaner.process(extreme_age_df)
 
         # 年龄应该允许极端值（如150），通过质量标记
         assert result["age"].iloc[0] == 150
         assert "异常值" in result["data_quality_flag"].iloc[0]
 
-    def test_contract_monthly_income_negative_handling(self, cleaner, sample_raw_data):
+    def test_contract_monthly_income_negative_handling(self, sample_result):
         """测试月收入负数处理"""
-        result = cleaner.process(sample_raw_data)
+        result = sample_result
 
         # 负数应该被转为NULL
         assert pd.isna(result["monthly_income"].iloc[3])